@@ -5,9 +5,11 @@ import pathlib
 from typing import Optional
 
 from podcast_agent.config import Config, load_config_from_env
+from podcast_agent.dedup import NearDuplicateDetector
 from podcast_agent.feeds import RSSFeedMonitor
-from podcast_agent.llm import EchoLLMClient, OpenAILLMClient
+from podcast_agent.llm import EchoLLMClient, HedgePolicy, OpenAILLMClient
 from podcast_agent.pipeline import PodcastPipeline
+from podcast_agent.preprocess import TranscriptPreprocessor
 from podcast_agent.storage import Storage
 from podcast_agent.transcript import TranscriptClient, YouTubeTranscriptClient
 
@@ -19,7 +21,19 @@ def build_llm_client(config: Config) -> OpenAILLMClient | EchoLLMClient:
     if config.llm.provider.lower() == "openai":
         if not config.llm.model:
             raise ValueError("OpenAI provider requires a model name in config")
-        return OpenAILLMClient(model=config.llm.model, system_prompt=config.llm.system_prompt)
+        hedge = None
+        if config.llm.hedging:
+            hedge = HedgePolicy(
+                percentile=config.llm.hedge_percentile,
+                budget=config.llm.hedge_budget,
+                fallback_model=config.llm.fallback_model,
+            )
+        return OpenAILLMClient(
+            model=config.llm.model,
+            system_prompt=config.llm.system_prompt,
+            timeout=config.llm.timeout_seconds,
+            hedge=hedge,
+        )
     logger.warning("Using echo LLM client; summaries will be placeholders")
     return EchoLLMClient()
 
@@ -28,6 +42,23 @@ def build_transcript_client() -> TranscriptClient:
     return YouTubeTranscriptClient()
 
 
+def build_deduplicator(config: Config) -> NearDuplicateDetector | None:
+    if not config.dedup.enabled:
+        return None
+    return NearDuplicateDetector(
+        threshold=config.dedup.similarity_threshold,
+        num_permutations=config.dedup.num_permutations,
+        bands=config.dedup.bands,
+        min_shingles=config.dedup.min_shingles,
+    )
+
+
+def build_preprocessor(config: Config) -> TranscriptPreprocessor | None:
+    if not config.preprocess.enabled:
+        return None
+    return TranscriptPreprocessor(config.preprocess.steps)
+
+
 def load_config(path: Optional[str] = None) -> Config:
     default_path = pathlib.Path(path or "config.json")
     if not default_path.exists():
@@ -41,13 +72,41 @@ def load_config(path: Optional[str] = None) -> Config:
 def main(config_path: Optional[str] = None) -> None:
     config = load_config(config_path)
     storage = Storage(pathlib.Path(config.database_path))
+    llm_client = build_llm_client(config)
     pipeline = PodcastPipeline(
         feed_monitor=RSSFeedMonitor(),
         transcript_client=build_transcript_client(),
-        llm_client=build_llm_client(config),
+        llm_client=llm_client,
         storage=storage,
+        deduplicator=build_deduplicator(config),
+        preprocessor=build_preprocessor(config),
     )
-    pipeline.run_once(config.feed_urls, language=config.youtube_language)
+    try:
+        pipeline.run_once(config.feed_urls, language=config.youtube_language)
+        if config.resummarize.enabled:
+            report = pipeline.resummarize(
+                order=config.resummarize.order,
+                max_episodes=config.resummarize.max_episodes,
+                max_seconds=config.resummarize.max_seconds,
+                stamp_unversioned=config.resummarize.stamp_unversioned,
+            )
+            logger.info(
+                "Re-summarized %d episodes (%d failed); %d still on an older summary version",
+                report.resummarized,
+                report.failed,
+                report.remaining,
+            )
+    finally:
+        llm_client.close()
+    if isinstance(llm_client, OpenAILLMClient):
+        stats = llm_client.stats
+        logger.info(
+            "LLM requests: %d, hedges fired: %d, hedges won: %d, deadlines exceeded: %d",
+            stats.requests,
+            stats.hedges_fired,
+            stats.hedges_won,
+            stats.deadlines_exceeded,
+        )
 
 
 if __name__ == "__main__":
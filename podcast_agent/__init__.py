@@ -2,9 +2,12 @@
 
 __all__ = [
     "config",
+    "dedup",
     "feeds",
     "llm",
     "pipeline",
+    "preprocess",
+    "server",
     "storage",
     "transcript",
 ]
@@ -18,6 +18,50 @@ class LLMConfig:
         "You are a helpful assistant summarizing podcast transcripts. "
         "Provide concise summaries and relevant tags."
     )
+    timeout_seconds: Optional[float] = 120.0
+    hedging: bool = False
+    hedge_percentile: float = 0.95
+    hedge_budget: float = 0.05
+    fallback_model: Optional[str] = None
+
+
+@dataclass
+class DedupConfig:
+    enabled: bool = True
+    similarity_threshold: float = 0.8
+    num_permutations: int = 128
+    bands: Optional[int] = None
+    min_shingles: int = 50
+
+
+@dataclass
+class PreprocessConfig:
+    enabled: bool = True
+    steps: List[str] = field(
+        default_factory=lambda: [
+            "drop_non_speech",
+            "merge_overlaps",
+            "remove_filler",
+            "collapse_whitespace",
+        ]
+    )
+
+
+@dataclass
+class ResummarizeConfig:
+    enabled: bool = False
+    order: str = "newest"
+    max_episodes: int = 20
+    max_seconds: Optional[float] = None
+    stamp_unversioned: bool = False
+
+
+@dataclass
+class ServerConfig:
+    host: str = "127.0.0.1"
+    port: int = 8080
+    pool_size: int = 4
+    cache_size: int = 256
 
 
 @dataclass
@@ -26,6 +70,10 @@ class Config:
     database_path: str = "podcasts.db"
     llm: LLMConfig = field(default_factory=LLMConfig)
     youtube_language: str = "en"
+    dedup: DedupConfig = field(default_factory=DedupConfig)
+    preprocess: PreprocessConfig = field(default_factory=PreprocessConfig)
+    server: ServerConfig = field(default_factory=ServerConfig)
+    resummarize: ResummarizeConfig = field(default_factory=ResummarizeConfig)
 
     @classmethod
     def load(cls, path: pathlib.Path) -> "Config":
@@ -33,11 +81,19 @@ class Config:
             raw = json.load(handle)
 
         llm_config = LLMConfig(**raw.get("llm", {}))
+        dedup_config = DedupConfig(**raw.get("dedup", {}))
+        preprocess_config = PreprocessConfig(**raw.get("preprocess", {}))
+        server_config = ServerConfig(**raw.get("server", {}))
+        resummarize_config = ResummarizeConfig(**raw.get("resummarize", {}))
         return cls(
             feed_urls=raw.get("feed_urls", []),
             database_path=raw.get("database_path", "podcasts.db"),
             llm=llm_config,
             youtube_language=raw.get("youtube_language", "en"),
+            dedup=dedup_config,
+            preprocess=preprocess_config,
+            server=server_config,
+            resummarize=resummarize_config,
         )
 
 
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import re
+import sys
+from array import array
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"\w+")
+# Share of pairs at exactly the similarity threshold that must land in a
+# common LSH bucket; the remainder would never be compared.
+_TARGET_RECALL = 0.9
+
+
+class MinHashSignature:
+    """Fixed-width MinHash sketch of a transcript's word shingles."""
+
+    _TYPECODE = "I"
+    ITEM_SIZE = 4
+
+    def __init__(self, values: array, *, bands: int) -> None:
+        if bands <= 0 or len(values) % bands:
+            raise ValueError("Signature length must be divisible by the number of bands")
+        self.values = values
+        self.bands = bands
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def similarity(self, other: "MinHashSignature") -> float:
+        """Estimate the Jaccard similarity of the two underlying shingle sets."""
+
+        if len(self) != len(other) or not self.values:
+            return 0.0
+        matches = sum(1 for a, b in zip(self.values, other.values) if a == b)
+        return matches / len(self.values)
+
+    def band_keys(self) -> List[str]:
+        """Return one LSH bucket key per band; equal keys mark candidate pairs."""
+
+        rows = len(self.values) // self.bands
+        keys = []
+        for band in range(self.bands):
+            chunk = self.values[band * rows : (band + 1) * rows]
+            keys.append(hashlib.blake2b(chunk.tobytes(), digest_size=8).hexdigest())
+        return keys
+
+    def to_bytes(self) -> bytes:
+        packed = array(self._TYPECODE, self.values)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        return packed.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes, *, bands: int) -> "MinHashSignature":
+        values = array(cls._TYPECODE)
+        values.frombytes(blob)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return cls(values, bands=bands)
+
+
+class NearDuplicateDetector:
+    """Computes MinHash signatures used to spot reposted episodes.
+
+    Transcripts are reduced to overlapping word shingles, and each of
+    ``num_permutations`` universal hash functions keeps its minimum over the
+    shingle set. Signatures are split into ``bands`` for locality-sensitive
+    hashing so that only transcripts sharing a band bucket are compared.
+
+    Unless given explicitly, ``bands`` is derived from ``threshold`` so that
+    pairs at the threshold become candidates at least 90% of the time.
+    Transcripts with fewer than ``min_shingles`` distinct shingles get no
+    signature, since a handful of words (or none) says nothing about reposts.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.8,
+        num_permutations: int = 128,
+        bands: int | None = None,
+        shingle_size: int = 5,
+        min_shingles: int = 50,
+        seed: int = 1,
+    ) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("Similarity threshold must be in (0, 1]")
+        if bands is None:
+            bands = lsh_bands_for(threshold, num_permutations)
+        if num_permutations % bands:
+            raise ValueError("num_permutations must be divisible by bands")
+        recall = candidate_probability(threshold, bands, num_permutations // bands)
+        if recall < _TARGET_RECALL:
+            logger.warning(
+                "LSH with %d bands finds only %.0f%% of pairs at similarity %.2f; "
+                "raise 'bands' or leave it unset to derive it from the threshold",
+                bands,
+                recall * 100,
+                threshold,
+            )
+        self.threshold = threshold
+        self.num_permutations = num_permutations
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        self.seed = seed
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_permutations)
+        ]
+
+    @property
+    def layout(self) -> str:
+        """Settings that must match for two signatures to be comparable."""
+
+        return f"permutations={self.num_permutations};seed={self.seed};shingle={self.shingle_size}"
+
+    def signature(self, transcript: str) -> MinHashSignature | None:
+        """Return the transcript's signature, or ``None`` if it is too short to compare."""
+
+        hashes = self._shingle_hashes(transcript)
+        if len(hashes) < max(1, self.min_shingles):
+            return None
+        values = array(
+            MinHashSignature._TYPECODE,
+            (
+                min((a * value + b) % _MERSENNE_PRIME for value in hashes) & _MAX_HASH
+                for a, b in self._permutations
+            ),
+        )
+        return MinHashSignature(values, bands=self.bands)
+
+    def _shingle_hashes(self, transcript: str) -> List[int]:
+        words = _WORD_RE.findall(transcript.lower())
+        if not words:
+            return []
+        size = min(self.shingle_size, len(words))
+        shingles = {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+        return [_stable_hash(shingle) for shingle in shingles]
+
+
+def candidate_probability(similarity: float, bands: int, rows: int) -> float:
+    """Chance that a pair with this Jaccard similarity shares an LSH bucket."""
+
+    return 1 - (1 - similarity**rows) ** bands
+
+
+def lsh_bands_for(threshold: float, num_permutations: int) -> int:
+    """Pick the band count with the most rows per band that still meets the recall target.
+
+    More rows per band means fewer dissimilar candidates to compare, so the
+    narrowest banding that catches pairs at ``threshold`` is preferred.
+    """
+
+    for rows in range(num_permutations, 0, -1):
+        if num_permutations % rows:
+            continue
+        bands = num_permutations // rows
+        if candidate_probability(threshold, bands, rows) >= _TARGET_RECALL:
+            return bands
+    return num_permutations
+
+
+def _stable_hash(value: str) -> int:
+    """Process-independent 32-bit hash (``hash()`` is salted per interpreter)."""
+
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "little")
+
@@ -18,6 +18,7 @@ class Episode:
     published: dt.datetime | None
     duration_seconds: int | None = None
     is_probable_podcast: bool = True
+    view_count: int | None = None
 
 
 class RSSFeedMonitor:
@@ -49,6 +50,7 @@ class RSSFeedMonitor:
                     published=published,
                     duration_seconds=duration_seconds,
                     is_probable_podcast=is_podcast,
+                    view_count=_parse_view_count(getattr(entry, "media_statistics", None)),
                 )
             )
         return episodes
@@ -127,6 +129,7 @@ class YouTubeChannelMonitor:
                     published=published,
                     duration_seconds=duration_seconds,
                     is_probable_podcast=is_podcast,
+                    view_count=entry_dict.get("view_count"),
                 )
             )
 
@@ -178,6 +181,19 @@ def _parse_duration(raw: object) -> int | None:
     return None
 
 
+def _parse_view_count(statistics: object) -> int | None:
+    """Read the ``<media:statistics views=...>`` count YouTube feeds provide."""
+
+    if not isinstance(statistics, dict):
+        return None
+    views = statistics.get("views")
+    if isinstance(views, str) and views.strip().isdigit():
+        return int(views)
+    if isinstance(views, int):
+        return views
+    return None
+
+
 def _extract_published(entry: dict) -> dt.datetime | None:
     """Parse published timestamp from yt-dlp entries when available."""
 
@@ -1,39 +1,245 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Iterable, List, Tuple
+from typing import Deque, Iterable, List, Tuple
 
 import openai
 
+logger = logging.getLogger(__name__)
+
+# A request needs room for its primary call and one hedge; two more workers
+# absorb calls abandoned at a deadline or lost to a hedge before the pool is
+# replaced (see ``OpenAILLMClient._ensure_capacity``).
+_CALLS_PER_REQUEST = 2
+_MAX_ABANDONED_CALLS = 2
+
 
 @dataclass
 class SummaryResult:
     summary: str
     tags: List[str]
+    version: str | None = None
+
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when no LLM response arrives before the request deadline."""
+
+
+@dataclass
+class HedgePolicy:
+    """When to send a duplicate request for a slow LLM call.
+
+    A hedge fires once the primary call has run longer than ``percentile`` of
+    recently observed latencies. Hedges are capped at ``budget`` extra requests
+    per request sent, e.g. ``0.05`` allows at most one hedge per twenty calls.
+    """
+
+    percentile: float = 0.95
+    budget: float = 0.05
+    min_samples: int = 20
+    window: int = 200
+    fallback_model: str | None = None
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedges_fired: int = 0
+    hedges_won: int = 0
+    deadlines_exceeded: int = 0
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, *, min_samples: int = 1) -> float | None:
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
 
 
 class LLMClient:
-    def summarize_and_tag(self, transcript: str, *, title: str | None = None) -> SummaryResult:
+    @property
+    def summary_version(self) -> str:
+        """Identifier of the model and prompt that produce this client's summaries."""
+
+        return type(self).__name__
+
+    def summarize_and_tag(
+        self, transcript: str, *, title: str | None = None, allow_fallback: bool = True
+    ) -> SummaryResult:
+        """Summarize a transcript.
+
+        ``allow_fallback=False`` asks clients with a fallback model to stick to
+        the primary one, so the result carries the current ``summary_version``.
+        """
+
         raise NotImplementedError
 
+    def close(self) -> None:
+        """Release resources held by the client."""
+
 
 class OpenAILLMClient(LLMClient):
-    def __init__(self, model: str, system_prompt: str) -> None:
+    def __init__(
+        self,
+        model: str,
+        system_prompt: str,
+        *,
+        timeout: float | None = None,
+        hedge: HedgePolicy | None = None,
+    ) -> None:
         self.model = model
         self.system_prompt = system_prompt
+        self.timeout = timeout
+        self.hedge = hedge
+        self.stats = HedgeStats()
+        self._latencies = LatencyTracker(hedge.window if hedge else 200)
+        self._max_workers = _CALLS_PER_REQUEST + _MAX_ABANDONED_CALLS
+        self._executor = self._new_executor()
+        self._inflight: set[Future] = set()
+        self._inflight_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Stop accepting calls; abandoned calls end at the SDK timeout."""
 
-    def summarize_and_tag(self, transcript: str, *, title: str | None = None) -> SummaryResult:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def summary_version(self) -> str:
+        return self._version_for(self.model)
+
+    def _version_for(self, model: str) -> str:
+        prompt_digest = hashlib.blake2b(self.system_prompt.encode("utf-8"), digest_size=6).hexdigest()
+        return f"openai:{model}:{prompt_digest}"
+
+    def summarize_and_tag(
+        self, transcript: str, *, title: str | None = None, allow_fallback: bool = True
+    ) -> SummaryResult:
         prompt = self._build_prompt(transcript, title)
+        model, content = self._request(prompt, allow_fallback=allow_fallback)
+        version = self._version_for(model)
+        if not content:
+            return SummaryResult(summary="", tags=[], version=version)
+        summary, tags = self._parse_response(content)
+        return SummaryResult(summary=summary.strip(), tags=list(tags), version=version)
+
+    def _request(self, prompt: List[dict], *, allow_fallback: bool = True) -> Tuple[str, str | None]:
+        """Run the completion under the deadline, hedging slow calls if enabled."""
+
+        self.stats.requests += 1
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        self._ensure_capacity()
+        primary = self._submit(self.model, prompt)
+
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is not None:
+            done, _ = wait([primary], timeout=_remaining(deadline, cap=hedge_delay))
+            if not done and (deadline is None or time.monotonic() < deadline):
+                model = (allow_fallback and self.hedge.fallback_model) or self.model
+                self.stats.hedges_fired += 1
+                logger.info("LLM call exceeded %.1fs; hedging with %s", hedge_delay, model)
+                hedged = self._submit(model, prompt)
+                return self._first_result([primary, hedged], deadline, hedged=hedged)
+        return self._first_result([primary], deadline)
+
+    def _hedge_delay(self) -> float | None:
+        if self.hedge is None:
+            return None
+        if self.stats.hedges_fired + 1 > self.hedge.budget * self.stats.requests:
+            return None
+        return self._latencies.percentile(self.hedge.percentile, min_samples=self.hedge.min_samples)
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="llm")
+
+    def _ensure_capacity(self) -> None:
+        """Swap in a fresh pool if abandoned calls would queue this request.
+
+        Calls left running after a deadline or a lost hedge still occupy a
+        worker until the SDK timeout fires. Once they would leave fewer than
+        ``_CALLS_PER_REQUEST`` free workers, the old pool is shut down without
+        waiting and its stragglers finish on their own.
+        """
+
+        with self._inflight_lock:
+            if len(self._inflight) + _CALLS_PER_REQUEST <= self._max_workers:
+                return
+            logger.warning(
+                "%d abandoned LLM calls still running; starting a new worker pool",
+                len(self._inflight),
+            )
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            self._inflight = set()
+
+    def _submit(self, model: str, prompt: List[dict]) -> Future:
+        future = self._executor.submit(self._complete, model, prompt)
+        with self._inflight_lock:
+            inflight = self._inflight
+            inflight.add(future)
+        future.add_done_callback(lambda done: self._release(inflight, done))
+        return future
+
+    def _release(self, inflight: set[Future], future: Future) -> None:
+        with self._inflight_lock:
+            inflight.discard(future)
+
+    def _complete(self, model: str, prompt: List[dict]) -> Tuple[str, str | None]:
+        started = time.monotonic()
+        options: dict = {}
+        if self.timeout is not None:
+            # Passing timeout=None would disable the SDK's own default timeout.
+            options["timeout"] = self.timeout
         response = openai.chat.completions.create(
-            model=self.model,
+            model=model,
             messages=prompt,
             temperature=0.3,
+            **options,
         )
-        content = response.choices[0].message.content
-        if not content:
-            return SummaryResult(summary="", tags=[])
-        summary, tags = self._parse_response(content)
-        return SummaryResult(summary=summary.strip(), tags=list(tags))
+        if model == self.model:
+            # The hedge delay is a percentile of primary-model latency; a
+            # faster fallback model would otherwise pull it down.
+            self._latencies.record(time.monotonic() - started)
+        return model, response.choices[0].message.content
+
+    def _first_result(
+        self, futures: List[Future], deadline: float | None, *, hedged: Future | None = None
+    ) -> Tuple[str, str | None]:
+        pending = set(futures)
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, timeout=_remaining(deadline), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                if future is hedged:
+                    self.stats.hedges_won += 1
+                return future.result()
+        if error is not None and not pending:
+            raise error
+        self.stats.deadlines_exceeded += 1
+        raise LLMTimeoutError(f"No LLM response within {self.timeout}s")
 
     def _build_prompt(self, transcript: str, title: str | None) -> List[dict]:
         title_prefix = f"Podcast title: {title}\n" if title else ""
@@ -55,8 +261,21 @@ class OpenAILLMClient(LLMClient):
         return content.strip(), []
 
 
+def _remaining(deadline: float | None, *, cap: float | None = None) -> float | None:
+    if deadline is None:
+        return cap
+    remaining = max(0.0, deadline - time.monotonic())
+    return remaining if cap is None else min(remaining, cap)
+
+
 class EchoLLMClient(LLMClient):
-    def summarize_and_tag(self, transcript: str, *, title: str | None = None) -> SummaryResult:
+    @property
+    def summary_version(self) -> str:
+        return "echo"
+
+    def summarize_and_tag(
+        self, transcript: str, *, title: str | None = None, allow_fallback: bool = True
+    ) -> SummaryResult:
         preview = transcript[:500]
         summary = f"Summary placeholder for {title or 'episode'}: {preview}"
-        return SummaryResult(summary=summary, tags=["placeholder"])
+        return SummaryResult(summary=summary, tags=["placeholder"], version=self.summary_version)
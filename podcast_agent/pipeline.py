@@ -1,16 +1,27 @@
 from __future__ import annotations
 
 import logging
+import time
+from dataclasses import dataclass
 from typing import Iterable
 
+from podcast_agent.dedup import NearDuplicateDetector
 from podcast_agent.feeds import Episode, RSSFeedMonitor
-from podcast_agent.llm import LLMClient
+from podcast_agent.llm import LLMClient, LLMTimeoutError
+from podcast_agent.preprocess import TranscriptPreprocessor
 from podcast_agent.storage import Storage
-from podcast_agent.transcript import TranscriptClient
+from podcast_agent.transcript import SegmentIndex, TranscriptClient
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ResummarizeReport:
+    resummarized: int = 0
+    failed: int = 0
+    remaining: int = 0
+
+
 class PodcastPipeline:
     def __init__(
         self,
@@ -18,11 +29,22 @@ class PodcastPipeline:
         transcript_client: TranscriptClient,
         llm_client: LLMClient,
         storage: Storage,
+        *,
+        deduplicator: NearDuplicateDetector | None = None,
+        preprocessor: TranscriptPreprocessor | None = None,
     ) -> None:
         self.feed_monitor = feed_monitor
         self.transcript_client = transcript_client
         self.llm_client = llm_client
         self.storage = storage
+        self.deduplicator = deduplicator
+        if deduplicator is not None:
+            storage.ensure_minhash_layout(
+                deduplicator.layout,
+                num_permutations=deduplicator.num_permutations,
+                bands=deduplicator.bands,
+            )
+        self.preprocessor = preprocessor
 
     def run_once(self, feed_urls: Iterable[str], *, language: str = "en") -> None:
         for feed_url in feed_urls:
@@ -33,21 +55,146 @@ class PodcastPipeline:
             for episode in episodes:
                 if self.storage.is_processed(feed_url, episode.episode_id):
                     logger.debug("Episode %s already processed", episode.episode_id)
+                    if episode.view_count is not None:
+                        self.storage.update_view_count(
+                            feed_url, episode.episode_id, episode.view_count
+                        )
                     continue
-                self._process_episode(episode, language=language)
+                try:
+                    self._process_episode(episode, language=language)
+                except LLMTimeoutError:
+                    logger.warning(
+                        "LLM deadline exceeded for %s; will retry on the next run",
+                        episode.title,
+                    )
 
     def _process_episode(self, episode: Episode, *, language: str) -> None:
         logger.info("Processing episode %s", episode.title)
-        transcript = self.transcript_client.fetch_transcript(
+        segments = self.transcript_client.fetch_segments(
             episode.link, language=language
         )
+        transcript, segment_index = SegmentIndex.build(segments)
+
+        minhash = None
+        if self.deduplicator is not None:
+            minhash = self.deduplicator.signature(transcript)
+            duplicate = None
+            if minhash is not None:
+                duplicate = self.storage.find_near_duplicate(
+                    minhash,
+                    threshold=self.deduplicator.threshold,
+                    exclude=(episode.feed_url, episode.episode_id),
+                )
+            if duplicate is not None:
+                self.storage.save_episode(
+                    episode,
+                    transcript=transcript,
+                    summary=duplicate.summary,
+                    tags=duplicate.tags,
+                    segments=segment_index,
+                    minhash=minhash,
+                    duplicate_of=duplicate.row_id,
+                    summary_version=duplicate.summary_version,
+                )
+                logger.info(
+                    "Linked %s to existing summary of %s (similarity %.2f)",
+                    episode.title,
+                    duplicate.episode_id,
+                    duplicate.similarity,
+                )
+                return
+
         summary_result = self.llm_client.summarize_and_tag(
-            transcript, title=episode.title
+            self._prompt_text(transcript, title=episode.title), title=episode.title
         )
         self.storage.save_episode(
             episode,
             transcript=transcript,
             summary=summary_result.summary,
             tags=summary_result.tags,
+            segments=segment_index,
+            minhash=minhash,
+            summary_version=summary_result.version or self.llm_client.summary_version,
         )
         logger.info("Stored summary for %s", episode.title)
+
+    def resummarize(
+        self,
+        *,
+        order: str = "newest",
+        max_episodes: int = 20,
+        max_seconds: float | None = None,
+        stamp_unversioned: bool = False,
+    ) -> ResummarizeReport:
+        """Re-summarize stored episodes whose summary version is out of date.
+
+        Stored transcripts are reused, so no feeds or transcripts are fetched.
+        At most ``max_episodes`` are handled per call (and no new one is
+        started after ``max_seconds``), letting a model or prompt change roll
+        through the archive over several runs. Old summaries stay in place
+        until their replacement is written.
+
+        Summaries stored before versions were recorded count as stale. Pass
+        ``stamp_unversioned=True`` to label them with the current version
+        first, when they were produced by the current model and prompt.
+        """
+
+        version = self.llm_client.summary_version
+        if stamp_unversioned:
+            stamped = self.storage.stamp_unversioned_summaries(version)
+            if stamped:
+                logger.info("Stamped %d unversioned summaries as %s", stamped, version)
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        report = ResummarizeReport(remaining=self.storage.count_stale_summaries(version))
+        stale = self.storage.list_stale_summaries(version, order=order, limit=max_episodes)
+        for item in stale:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            transcript = self.storage.fetch_transcript(item.row_id)
+            if transcript is None:
+                continue
+            logger.info(
+                "Re-summarizing %s (%s -> %s)", item.title, item.summary_version, version
+            )
+            try:
+                result = self.llm_client.summarize_and_tag(
+                    self._prompt_text(transcript, title=item.title),
+                    title=item.title,
+                    allow_fallback=False,
+                )
+            except LLMTimeoutError:
+                logger.warning("LLM deadline exceeded re-summarizing %s", item.title)
+                report.failed += 1
+                continue
+            self.storage.update_summary(
+                item.row_id,
+                summary=result.summary,
+                tags=result.tags,
+                summary_version=result.version or version,
+            )
+            if result.version not in (None, version):
+                # Newer text than before, but still stale; it stays in the queue.
+                logger.warning(
+                    "Re-summary of %s came back as %s, not %s",
+                    item.title,
+                    result.version,
+                    version,
+                )
+                report.failed += 1
+                continue
+            report.resummarized += 1
+            report.remaining -= 1
+        return report
+
+    def _prompt_text(self, transcript: str, *, title: str | None) -> str:
+        if self.preprocessor is None:
+            return transcript
+        cleaned = self.preprocessor.process(transcript)
+        logger.info(
+            "Preprocessed transcript for %s: ~%d -> ~%d tokens (%.0f%% smaller)",
+            title,
+            cleaned.tokens_before,
+            cleaned.tokens_after,
+            cleaned.reduction * 100,
+        )
+        return cleaned.text
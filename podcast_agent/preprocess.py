@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence
+
+from podcast_agent.transcript import SEGMENT_SEPARATOR
+
+
+PreprocessStep = Callable[[List[str]], List[str]]
+
+_NON_SPEECH_RE = re.compile(
+    r"\[[^\]]*\]"
+    r"|\((?:music|applause|laughter|laughs|laughing|inaudible|silence|crosstalk|cheering)\)"
+    r"|[♪♫]+"
+    r"|^\s*>>\s*",
+    re.IGNORECASE,
+)
+# "mm" is left alone since it doubles as a unit ("35 mm"); the hyphen guards
+# keep words like "uh-huh" intact.
+_FILLER_RE = re.compile(r"\s*(?<![\w-])(?:u+m+|u+h+|uhm+|erm+|hmm+)(?![\w-]),?", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+# Auto-generated captions roll forward a few words at a time; shorter overlaps,
+# including a one-word line repeated ("yeah" / "yeah"), are more likely to be
+# genuine repetition ("that that") than caption echo, so they are kept.
+_MIN_OVERLAP_WORDS = 2
+
+
+@dataclass
+class PreprocessResult:
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def reduction(self) -> float:
+        if not self.tokens_before:
+            return 0.0
+        return 1 - self.tokens_after / self.tokens_before
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count as words plus punctuation marks."""
+
+    return len(_TOKEN_RE.findall(text))
+
+
+def drop_non_speech(lines: List[str]) -> List[str]:
+    """Remove caption markers such as ``[Music]``, ``(applause)`` and ``♪``."""
+
+    return [_NON_SPEECH_RE.sub(" ", line) for line in lines]
+
+
+def merge_caption_overlaps(lines: List[str]) -> List[str]:
+    """Drop repeated caption lines and words echoed from the previous line."""
+
+    merged: List[str] = []
+    previous: List[str] = []
+    for line in lines:
+        words = line.split()
+        if not words:
+            continue
+        overlap = _overlap(previous, words)
+        if overlap < len(words):
+            merged.append(" ".join(words[overlap:]))
+        previous = words
+    return merged
+
+
+def _overlap(previous: Sequence[str], current: Sequence[str]) -> int:
+    for size in range(min(len(previous), len(current)), _MIN_OVERLAP_WORDS - 1, -1):
+        if previous[-size:] == current[:size]:
+            return size
+    return 0
+
+
+def remove_filler(lines: List[str]) -> List[str]:
+    """Strip hesitation sounds (um, uh, erm, hmm) that carry no content."""
+
+    return [_FILLER_RE.sub("", line) for line in lines]
+
+
+def collapse_whitespace(lines: List[str]) -> List[str]:
+    """Normalize internal whitespace and drop lines left empty by other steps."""
+
+    collapsed = (_WHITESPACE_RE.sub(" ", line).strip() for line in lines)
+    return [line for line in collapsed if line]
+
+
+STEPS: Dict[str, PreprocessStep] = {
+    "drop_non_speech": drop_non_speech,
+    "merge_overlaps": merge_caption_overlaps,
+    "remove_filler": remove_filler,
+    "collapse_whitespace": collapse_whitespace,
+}
+
+DEFAULT_STEPS = ("drop_non_speech", "merge_overlaps", "remove_filler", "collapse_whitespace")
+
+
+class TranscriptPreprocessor:
+    """Runs caption-cleaning steps over a transcript before it is summarized.
+
+    Each step receives and returns the list of caption lines, so custom steps
+    can be registered in ``STEPS`` or passed directly. The cleaned lines are
+    joined with single spaces, which also removes the per-caption line breaks
+    from the prompt.
+    """
+
+    def __init__(self, steps: Iterable[str | PreprocessStep] = DEFAULT_STEPS) -> None:
+        self.steps: List[PreprocessStep] = []
+        for step in steps:
+            if callable(step):
+                self.steps.append(step)
+                continue
+            if step not in STEPS:
+                raise ValueError(f"Unknown preprocessing step: {step}")
+            self.steps.append(STEPS[step])
+
+    def process(self, transcript: str) -> PreprocessResult:
+        lines = transcript.split(SEGMENT_SEPARATOR)
+        for step in self.steps:
+            lines = step(lines)
+        text = " ".join(lines)
+        return PreprocessResult(
+            text=text,
+            tokens_before=estimate_tokens(transcript),
+            tokens_after=estimate_tokens(text),
+        )
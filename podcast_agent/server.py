@@ -0,0 +1,334 @@
+"""Read-only HTTP API over the episode database.
+
+Run with ``python -m podcast_agent.server``; settings come from the
+``server`` section of the config file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import pathlib
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from podcast_agent.config import load_config_from_env
+
+logger = logging.getLogger(__name__)
+
+_EPISODE_COLUMNS = "id, feed_url, episode_id, title, link, published, processed_at"
+
+
+class NotFound(LookupError):
+    """Raised by query handlers when the requested resource does not exist."""
+
+
+class ReadOnlyConnectionPool:
+    """Fixed-size pool of ``mode=ro`` SQLite connections shared across threads."""
+
+    def __init__(self, db_path: Path, *, size: int = 4) -> None:
+        self.db_path = Path(db_path)
+        self._connections: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._connections.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    def close(self) -> None:
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+@dataclass
+class CachedResponse:
+    version: str
+    etag: str
+    body: bytes
+
+
+class ResponseCache:
+    """Thread-safe LRU of rendered responses tagged with the data version."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class EpisodeQueryService:
+    """Answers read queries and caches them until ``processed_at`` moves.
+
+    The data version is the newest ``processed_at`` in the table, read through
+    its index, so every pipeline write invalidates cached responses while
+    unchanged data is served from memory with a stable ETag.
+    """
+
+    def __init__(self, pool: ReadOnlyConnectionPool, cache: ResponseCache) -> None:
+        self.pool = pool
+        self.cache = cache
+        self._routes: List[Tuple[Tuple[str, ...], Callable[..., object]]] = [
+            (("feeds",), self._latest_per_feed),
+            (("episodes", None), self._episode_detail),
+            (("episodes", None, "summary"), self._episode_summary),
+            (("tags",), self._tag_counts),
+            (("tags", None), self._episodes_for_tag),
+        ]
+
+    def respond(self, path: str, query: Dict[str, List[str]]) -> CachedResponse:
+        version = self._data_version()
+        key = f"{path}?{sorted(query.items())}"
+        cached = self.cache.get(key, version)
+        if cached is not None:
+            return cached
+
+        payload = self._dispatch(path, query)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        entry = CachedResponse(version=version, etag=etag, body=body)
+        self.cache.put(key, entry)
+        return entry
+
+    def _data_version(self) -> str:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT MAX(processed_at) FROM episodes").fetchone()
+        return row[0] or ""
+
+    def _dispatch(self, path: str, query: Dict[str, List[str]]) -> object:
+        parts = tuple(unquote(part) for part in path.strip("/").split("/") if part)
+        for pattern, handler in self._routes:
+            if len(pattern) != len(parts):
+                continue
+            if all(expected is None or expected == part for expected, part in zip(pattern, parts)):
+                args = [part for expected, part in zip(pattern, parts) if expected is None]
+                return handler(*args, query=query)
+        raise NotFound(path)
+
+    def _latest_per_feed(self, *, query: Dict[str, List[str]]) -> object:
+        # Rank using only columns in idx_episodes_feed_published, then fetch
+        # the surviving rows; reading other columns for every episode would
+        # walk past each stored transcript.
+        limit = _int_param(query, "limit", default=5)
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {_EPISODE_COLUMNS} FROM episodes
+                JOIN (
+                    SELECT id AS ranked_id, ROW_NUMBER() OVER (
+                        PARTITION BY feed_url ORDER BY published DESC, id DESC
+                    ) AS position
+                    FROM episodes
+                ) ON ranked_id = id
+                WHERE position <= ?
+                ORDER BY feed_url, position
+                """,
+                (limit,),
+            ).fetchall()
+        feeds: Dict[str, List[dict]] = {}
+        for row in rows:
+            feeds.setdefault(row["feed_url"], []).append(_episode_dict(row))
+        return {"feeds": [{"feed_url": url, "episodes": eps} for url, eps in feeds.items()]}
+
+    def _episode_detail(self, row_id: str, *, query: Dict[str, List[str]]) -> object:
+        row = self._fetch_episode(row_id, f"{_EPISODE_COLUMNS}, summary, tags, duplicate_of")
+        detail = _episode_dict(row)
+        detail.update(
+            summary=row["summary"],
+            tags=_split_tags(row["tags"]),
+            duplicate_of=row["duplicate_of"],
+        )
+        return detail
+
+    def _episode_summary(self, row_id: str, *, query: Dict[str, List[str]]) -> object:
+        row = self._fetch_episode(row_id, "id, summary, tags")
+        return {"id": row["id"], "summary": row["summary"], "tags": _split_tags(row["tags"])}
+
+    def _tag_counts(self, *, query: Dict[str, List[str]]) -> object:
+        counts: Dict[str, int] = {}
+        with self.pool.connection() as conn:
+            for (tags,) in conn.execute("SELECT tags FROM episodes WHERE tags IS NOT NULL AND tags != ''"):
+                for tag in _split_tags(tags):
+                    key = tag.lower()
+                    counts[key] = counts.get(key, 0) + 1
+        ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return {"tags": [{"tag": tag, "count": count} for tag, count in ordered]}
+
+    def _episodes_for_tag(self, tag: str, *, query: Dict[str, List[str]]) -> object:
+        limit = _int_param(query, "limit", default=50)
+        wanted = tag.strip().lower()
+        matches: List[dict] = []
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {_EPISODE_COLUMNS}, tags FROM episodes
+                WHERE instr(lower(tags), ?) > 0
+                ORDER BY published DESC, id DESC
+                """,
+                (wanted,),
+            )
+            for row in rows:
+                if wanted in (t.lower() for t in _split_tags(row["tags"])):
+                    matches.append(_episode_dict(row))
+                    if len(matches) >= limit:
+                        break
+        return {"tag": tag, "episodes": matches}
+
+    def _fetch_episode(self, row_id: str, columns: str) -> sqlite3.Row:
+        if not row_id.isdigit():
+            raise NotFound(row_id)
+        with self.pool.connection() as conn:
+            row = conn.execute(f"SELECT {columns} FROM episodes WHERE id=?", (int(row_id),)).fetchone()
+        if row is None:
+            raise NotFound(row_id)
+        return row
+
+
+def _episode_dict(row: sqlite3.Row) -> dict:
+    return {
+        "id": row["id"],
+        "feed_url": row["feed_url"],
+        "episode_id": row["episode_id"],
+        "title": row["title"],
+        "link": row["link"],
+        "published": row["published"],
+        "processed_at": row["processed_at"],
+    }
+
+
+def _split_tags(raw: str | None) -> List[str]:
+    return [tag.strip() for tag in (raw or "").split(",") if tag.strip()]
+
+
+def _int_param(query: Dict[str, List[str]], name: str, *, default: int) -> int:
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        return max(1, min(500, int(values[0])))
+    except ValueError:
+        return default
+
+
+def make_handler(service: EpisodeQueryService) -> type[BaseHTTPRequestHandler]:
+    class EpisodeRequestHandler(BaseHTTPRequestHandler):
+        server_version = "podcast-agent/0.1"
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            url = urlsplit(self.path)
+            try:
+                entry = service.respond(url.path, parse_qs(url.query))
+            except NotFound:
+                self._send(HTTPStatus.NOT_FOUND, b'{"error": "not found"}')
+                return
+            except sqlite3.Error:
+                logger.exception("Query failed for %s", self.path)
+                self._send(HTTPStatus.SERVICE_UNAVAILABLE, b'{"error": "database unavailable"}')
+                return
+
+            if _etag_matches(entry.etag, self.headers.get("If-None-Match")):
+                self._send(HTTPStatus.NOT_MODIFIED, b"", etag=entry.etag)
+                return
+            self._send(HTTPStatus.OK, entry.body, etag=entry.etag)
+
+        def _send(self, status: HTTPStatus, body: bytes, *, etag: str | None = None) -> None:
+            self.send_response(status)
+            if etag is not None:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            if status != HTTPStatus.NOT_MODIFIED:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return EpisodeRequestHandler
+
+
+def _parse_etags(header: str | None) -> set[str]:
+    if not header:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def _etag_matches(etag: str, header: str | None) -> bool:
+    tags = _parse_etags(header)
+    return "*" in tags or etag in tags
+
+
+def build_server(
+    pool: ReadOnlyConnectionPool,
+    *,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    cache_size: int = 256,
+) -> ThreadingHTTPServer:
+    """Create the HTTP server; the caller owns ``pool`` and closes it on shutdown."""
+
+    service = EpisodeQueryService(pool, ResponseCache(cache_size))
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    config = load_config_from_env(pathlib.Path("config.json"))
+    pool = ReadOnlyConnectionPool(pathlib.Path(config.database_path), size=config.server.pool_size)
+    server = build_server(
+        pool,
+        host=config.server.host,
+        port=config.server.port,
+        cache_size=config.server.cache_size,
+    )
+    logger.info("Serving %s on http://%s:%d", config.database_path, config.server.host, config.server.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
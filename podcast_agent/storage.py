@@ -1,11 +1,41 @@
 from __future__ import annotations
 
 import datetime as dt
+import logging
 import sqlite3
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, List, Tuple
 
+from podcast_agent.dedup import MinHashSignature
 from podcast_agent.feeds import Episode
+from podcast_agent.transcript import SegmentIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NearDuplicate:
+    row_id: int
+    feed_url: str
+    episode_id: str
+    summary: str
+    tags: List[str]
+    similarity: float
+    summary_version: str | None = None
+
+
+@dataclass
+class StaleSummary:
+    row_id: int
+    title: str
+    summary_version: str | None
+
+
+RESUMMARIZE_ORDERS = {
+    "newest": "published IS NULL, published DESC, id DESC",
+    "most_viewed": "view_count IS NULL, view_count DESC, published DESC, id DESC",
+}
 
 
 class Storage:
@@ -20,6 +50,9 @@ class Storage:
 
     def _ensure_schema(self) -> None:
         with self._connect() as conn:
+            # WAL lets read-only consumers (see podcast_agent.server) query
+            # while the pipeline writes, without either side blocking.
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS episodes (
@@ -33,10 +66,74 @@ class Storage:
                     summary TEXT,
                     tags TEXT,
                     processed_at TEXT,
+                    segments BLOB,
+                    minhash BLOB,
+                    duplicate_of INTEGER REFERENCES episodes(id),
+                    summary_version TEXT,
+                    view_count INTEGER,
                     UNIQUE(feed_url, episode_id)
                 )
                 """
             )
+            self._ensure_columns(
+                conn,
+                "episodes",
+                {
+                    "segments": "BLOB",
+                    "minhash": "BLOB",
+                    "duplicate_of": "INTEGER REFERENCES episodes(id)",
+                    "summary_version": "TEXT",
+                    "view_count": "INTEGER",
+                },
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS summary_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    episode_row INTEGER NOT NULL REFERENCES episodes(id),
+                    summary_version TEXT,
+                    summary TEXT,
+                    tags TEXT,
+                    replaced_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS minhash_bands (
+                    episode_row INTEGER NOT NULL REFERENCES episodes(id),
+                    band INTEGER NOT NULL,
+                    bucket TEXT NOT NULL,
+                    PRIMARY KEY(episode_row, band)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS storage_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_minhash_bands_bucket ON minhash_bands(band, bucket)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_episodes_processed_at ON episodes(processed_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_episodes_feed_published ON episodes(feed_url, published)"
+            )
+
+    @staticmethod
+    def _ensure_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
+        """Add columns introduced after a database was first created."""
+
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, ddl in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
 
     def is_processed(self, feed_url: str, episode_id: str) -> bool:
         with self._connect() as conn:
@@ -53,14 +150,20 @@ class Storage:
         transcript: str,
         summary: str,
         tags: Iterable[str],
+        segments: SegmentIndex | None = None,
+        minhash: MinHashSignature | None = None,
+        duplicate_of: int | None = None,
+        summary_version: str | None = None,
     ) -> None:
         tag_str = ",".join(tags)
         processed_at = dt.datetime.utcnow().isoformat()
+        segment_blob = segments.to_bytes() if segments is not None else None
+        minhash_blob = minhash.to_bytes() if minhash is not None else None
         with self._connect() as conn:
             conn.execute(
                 """
-                INSERT INTO episodes (feed_url, episode_id, title, link, published, transcript, summary, tags, processed_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO episodes (feed_url, episode_id, title, link, published, transcript, summary, tags, processed_at, segments, minhash, duplicate_of, summary_version, view_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(feed_url, episode_id) DO UPDATE SET
                     title=excluded.title,
                     link=excluded.link,
@@ -68,7 +171,12 @@ class Storage:
                     transcript=excluded.transcript,
                     summary=excluded.summary,
                     tags=excluded.tags,
-                    processed_at=excluded.processed_at
+                    processed_at=excluded.processed_at,
+                    segments=excluded.segments,
+                    minhash=excluded.minhash,
+                    duplicate_of=excluded.duplicate_of,
+                    summary_version=excluded.summary_version,
+                    view_count=COALESCE(excluded.view_count, episodes.view_count)
                 """,
                 (
                     episode.feed_url,
@@ -80,8 +188,264 @@ class Storage:
                     summary,
                     tag_str,
                     processed_at,
+                    segment_blob,
+                    minhash_blob,
+                    duplicate_of,
+                    summary_version,
+                    episode.view_count,
                 ),
             )
+            row_id = conn.execute(
+                "SELECT id FROM episodes WHERE feed_url=? AND episode_id=?",
+                (episode.feed_url, episode.episode_id),
+            ).fetchone()[0]
+            conn.execute("DELETE FROM minhash_bands WHERE episode_row=?", (row_id,))
+            if minhash is not None:
+                conn.executemany(
+                    "INSERT INTO minhash_bands (episode_row, band, bucket) VALUES (?, ?, ?)",
+                    [(row_id, band, key) for band, key in enumerate(minhash.band_keys())],
+                )
+
+    def ensure_minhash_layout(self, layout: str, *, num_permutations: int, bands: int) -> None:
+        """Bring stored signatures and LSH buckets in line with the detector settings.
+
+        ``layout`` identifies how signatures are computed (see
+        :attr:`NearDuplicateDetector.layout`). Signatures from another layout
+        cannot be compared with new ones, so they are cleared and those
+        episodes simply stop being dedup candidates. Databases written before
+        the layout was recorded keep signatures whose length matches
+        ``num_permutations``. Buckets are rebuilt whenever the signature layout
+        or the band count changes, since bucket keys depend on both.
+        """
+
+        with self._connect() as conn:
+            meta = dict(
+                conn.execute(
+                    "SELECT key, value FROM storage_meta WHERE key IN ('minhash_layout', 'minhash_bands')"
+                ).fetchall()
+            )
+            stored_layout = meta.get("minhash_layout")
+            stored_bands = meta.get("minhash_bands")
+            if stored_layout == layout and stored_bands == str(bands):
+                return
+
+            if stored_layout is not None and stored_layout != layout:
+                cleared = conn.execute(
+                    "UPDATE episodes SET minhash=NULL WHERE minhash IS NOT NULL"
+                ).rowcount
+            else:
+                cleared = conn.execute(
+                    "UPDATE episodes SET minhash=NULL WHERE minhash IS NOT NULL AND length(minhash) != ?",
+                    (num_permutations * MinHashSignature.ITEM_SIZE,),
+                ).rowcount
+            if cleared:
+                logger.warning(
+                    "Cleared %d MinHash signatures computed with different dedup settings", cleared
+                )
+
+            conn.execute("DELETE FROM minhash_bands")
+            rows = conn.execute("SELECT id, minhash FROM episodes WHERE minhash IS NOT NULL").fetchall()
+            for row_id, blob in rows:
+                signature = MinHashSignature.from_bytes(blob, bands=bands)
+                conn.executemany(
+                    "INSERT INTO minhash_bands (episode_row, band, bucket) VALUES (?, ?, ?)",
+                    [(row_id, band, key) for band, key in enumerate(signature.band_keys())],
+                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO storage_meta (key, value) VALUES (?, ?)",
+                [("minhash_layout", layout), ("minhash_bands", str(bands))],
+            )
+
+    def find_near_duplicate(
+        self,
+        minhash: MinHashSignature,
+        *,
+        threshold: float,
+        exclude: Tuple[str, str] | None = None,
+    ) -> NearDuplicate | None:
+        """Return the most similar already-summarized episode above ``threshold``.
+
+        Candidates are episodes sharing at least one LSH band bucket with
+        ``minhash``; only those are compared signature to signature. Episodes
+        that are themselves duplicates are skipped so links always point at the
+        original summary.
+        """
+
+        keys = list(enumerate(minhash.band_keys()))
+        clauses = " OR ".join("(b.band=? AND b.bucket=?)" for _ in keys)
+        params: list = [value for pair in keys for value in pair]
+        query = f"""
+            SELECT DISTINCT e.id, e.feed_url, e.episode_id, e.summary, e.tags, e.minhash, e.summary_version
+            FROM minhash_bands AS b
+            JOIN episodes AS e ON e.id = b.episode_row
+            WHERE ({clauses})
+              AND e.summary IS NOT NULL
+              AND e.duplicate_of IS NULL
+              AND e.minhash IS NOT NULL
+        """
+        if exclude is not None:
+            query += " AND NOT (e.feed_url=? AND e.episode_id=?)"
+            params.extend(exclude)
+
+        best: NearDuplicate | None = None
+        with self._connect() as conn:
+            for row_id, feed_url, episode_id, summary, tags, blob, version in conn.execute(query, params):
+                if len(blob) != len(minhash) * MinHashSignature.ITEM_SIZE:
+                    continue
+                candidate = MinHashSignature.from_bytes(blob, bands=minhash.bands)
+                similarity = minhash.similarity(candidate)
+                if similarity < threshold or (best is not None and similarity <= best.similarity):
+                    continue
+                best = NearDuplicate(
+                    row_id=row_id,
+                    feed_url=feed_url,
+                    episode_id=episode_id,
+                    summary=summary,
+                    tags=[tag for tag in (tags or "").split(",") if tag],
+                    similarity=similarity,
+                    summary_version=version,
+                )
+        return best
+
+    _STALE_SUMMARY_FILTER = """
+        summary IS NOT NULL
+        AND transcript IS NOT NULL
+        AND duplicate_of IS NULL
+        AND (summary_version IS NULL OR summary_version != ?)
+    """
+
+    def list_stale_summaries(
+        self, current_version: str, *, order: str = "newest", limit: int | None = None
+    ) -> list[StaleSummary]:
+        """Return summarized episodes whose summary came from another model/prompt.
+
+        Duplicates are left out; they follow their original through
+        :meth:`update_summary`. Episodes without a stored transcript cannot be
+        re-summarized and are skipped as well.
+        """
+
+        if order not in RESUMMARIZE_ORDERS:
+            raise ValueError(f"Unknown re-summarization order: {order}")
+        query = f"""
+            SELECT id, title, summary_version FROM episodes
+            WHERE {self._STALE_SUMMARY_FILTER}
+            ORDER BY {RESUMMARIZE_ORDERS[order]}
+        """
+        params: list = [current_version]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            return [StaleSummary(*row) for row in conn.execute(query, params)]
+
+    def count_stale_summaries(self, current_version: str) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM episodes WHERE {self._STALE_SUMMARY_FILTER}",
+                (current_version,),
+            ).fetchone()[0]
+
+    def stamp_unversioned_summaries(self, summary_version: str) -> int:
+        """Label summaries stored before versions were recorded; returns the row count.
+
+        Use this when those summaries came from the current model and prompt,
+        so they are not all re-summarized the first time the job runs.
+        """
+
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE episodes SET summary_version=? WHERE summary IS NOT NULL AND summary_version IS NULL",
+                (summary_version,),
+            ).rowcount
+
+    def fetch_transcript(self, row_id: int) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT transcript FROM episodes WHERE id=?", (row_id,)).fetchone()
+        return row[0] if row else None
+
+    def update_summary(
+        self,
+        row_id: int,
+        *,
+        summary: str,
+        tags: Iterable[str],
+        summary_version: str,
+    ) -> None:
+        """Replace an episode's summary, archiving the previous one.
+
+        The episode and every duplicate linked to it switch to the new summary
+        in one transaction, so readers see either the old or the new version.
+        """
+
+        tag_str = ",".join(tags)
+        processed_at = dt.datetime.utcnow().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO summary_history (episode_row, summary_version, summary, tags, replaced_at)
+                SELECT id, summary_version, summary, tags, ? FROM episodes WHERE id=?
+                """,
+                (processed_at, row_id),
+            )
+            conn.execute(
+                """
+                UPDATE episodes SET summary=?, tags=?, summary_version=?, processed_at=?
+                WHERE id=? OR duplicate_of=?
+                """,
+                (summary, tag_str, summary_version, processed_at, row_id, row_id),
+            )
+
+    def fetch_segment_index(self, feed_url: str, episode_id: str) -> SegmentIndex | None:
+        with self._connect() as conn:
+            cur = conn.execute(
+                "SELECT segments FROM episodes WHERE feed_url=? AND episode_id=?",
+                (feed_url, episode_id),
+            )
+            row = cur.fetchone()
+        if row is None or row[0] is None:
+            return None
+        return SegmentIndex.from_bytes(row[0])
+
+    def transcript_between(
+        self, feed_url: str, episode_id: str, start: float, end: float
+    ) -> str | None:
+        """Return the transcript text spoken between ``start`` and ``end`` seconds.
+
+        Only the packed segment index is loaded; the matching text is sliced
+        inside SQLite so the full transcript never leaves the database.
+        Returns ``None`` when the episode has no caption timing.
+        """
+
+        index = self.fetch_segment_index(feed_url, episode_id)
+        if index is None:
+            return None
+        begin, finish = index.char_range(start, end)
+        if finish <= begin:
+            return ""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "SELECT substr(transcript, ?, ?) FROM episodes WHERE feed_url=? AND episode_id=?",
+                (begin + 1, finish - begin, feed_url, episode_id),
+            )
+            row = cur.fetchone()
+        return row[0] if row else None
+
+    def timestamp_at(self, feed_url: str, episode_id: str, offset: int) -> float | None:
+        """Return the playback time (seconds) for a transcript offset, or ``None`` without timing."""
+
+        index = self.fetch_segment_index(feed_url, episode_id)
+        if index is None:
+            return None
+        return index.timestamp_at(offset)
+
+    def update_view_count(self, feed_url: str, episode_id: str, view_count: int) -> None:
+        """Refresh the view count used to prioritize re-summarization."""
+
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE episodes SET view_count=? WHERE feed_url=? AND episode_id=?",
+                (view_count, feed_url, episode_id),
+            )
 
     def list_missing(self, feed_url: str) -> list[tuple[str, str]]:
         with self._connect() as conn:
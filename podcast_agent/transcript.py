@@ -1,15 +1,157 @@
 from __future__ import annotations
 
 import re
-from typing import List
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
 
 from youtube_transcript_api import YouTubeTranscriptApi
 
 
+SEGMENT_SEPARATOR = "\n"
+
+
+@dataclass
+class TranscriptSegment:
+    text: str
+    start: float | None
+    duration: float | None
+
+
+class SegmentIndex:
+    """Timing index mapping transcript character ranges to playback time.
+
+    Four parallel ``uint32`` arrays are kept per caption: start and duration in
+    milliseconds, plus the character offset and length of the caption inside
+    the joined transcript text. The arrays pack into a single BLOB so a whole
+    episode is one row in SQLite, and lookups binary-search the start/offset
+    arrays instead of walking the text.
+    """
+
+    _TYPECODE = "I"
+
+    def __init__(
+        self,
+        starts: array,
+        durations: array,
+        offsets: array,
+        lengths: array,
+    ) -> None:
+        if not len(starts) == len(durations) == len(offsets) == len(lengths):
+            raise ValueError("Segment index arrays must have the same length")
+        self.starts = starts
+        self.durations = durations
+        self.offsets = offsets
+        self.lengths = lengths
+        # Running maximum of caption end times. Captions overlap in time, so a
+        # caption that started long before a window can still be playing in it;
+        # this array is non-decreasing and can be binary-searched for that case.
+        self._max_ends = array("Q")
+        latest = 0
+        for caption_start, caption_duration in zip(starts, durations):
+            latest = max(latest, caption_start + caption_duration)
+            self._max_ends.append(latest)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def build(cls, segments: Iterable[TranscriptSegment]) -> Tuple[str, "SegmentIndex | None"]:
+        """Join segment texts and return the transcript with its index.
+
+        Timed segments are ordered by start time first, since lookups
+        binary-search the start column. If any segment lacks timing the text is
+        joined as given and no index is returned, so lookups report "unknown"
+        instead of silence.
+        """
+
+        segments = [segment for segment in segments if segment.text]
+        if any(segment.start is None or segment.duration is None for segment in segments):
+            return SEGMENT_SEPARATOR.join(segment.text for segment in segments), None
+        segments.sort(key=lambda segment: segment.start)
+
+        starts = array(cls._TYPECODE)
+        durations = array(cls._TYPECODE)
+        offsets = array(cls._TYPECODE)
+        lengths = array(cls._TYPECODE)
+        parts: List[str] = []
+        cursor = 0
+        for segment in segments:
+            if parts:
+                cursor += len(SEGMENT_SEPARATOR)
+            starts.append(max(0, round(segment.start * 1000)))
+            durations.append(max(0, round(segment.duration * 1000)))
+            offsets.append(cursor)
+            lengths.append(len(segment.text))
+            parts.append(segment.text)
+            cursor += len(segment.text)
+        return SEGMENT_SEPARATOR.join(parts), cls(starts, durations, offsets, lengths)
+
+    def to_bytes(self) -> bytes:
+        """Serialize as four little-endian ``uint32`` arrays laid end to end."""
+
+        packed = array(self._TYPECODE)
+        for column in (self.starts, self.durations, self.offsets, self.lengths):
+            packed.extend(column)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        return packed.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "SegmentIndex":
+        packed = array(cls._TYPECODE)
+        packed.frombytes(blob)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        if len(packed) % 4:
+            raise ValueError("Corrupt segment index: length is not a multiple of 4 columns")
+        count = len(packed) // 4
+        columns = [packed[i * count : (i + 1) * count] for i in range(4)]
+        return cls(*columns)
+
+    def char_range(self, start: float, end: float) -> Tuple[int, int]:
+        """Return the ``[begin, end)`` character span spoken between two times.
+
+        Any caption overlapping ``[start, end)`` (in seconds) is included, even
+        one that started well before ``start``. The span is contiguous, so
+        shorter captions lying between overlapping ones come along with them.
+        An empty span is returned when nothing is spoken in the window.
+        """
+
+        start_ms = max(0, round(start * 1000))
+        end_ms = max(0, round(end * 1000))
+        if not self.starts or end_ms <= start_ms:
+            return 0, 0
+
+        last = bisect_left(self.starts, end_ms)
+        first = bisect_right(self._max_ends, start_ms)
+        if first >= last:
+            return 0, 0
+        return self.offsets[first], self.offsets[last - 1] + self.lengths[last - 1]
+
+    def timestamp_at(self, offset: int) -> float | None:
+        """Return the start time (seconds) of the caption containing ``offset``."""
+
+        if not self.offsets or offset < 0:
+            return None
+        index = bisect_right(self.offsets, offset) - 1
+        if index < 0:
+            return None
+        return self.starts[index] / 1000
+
+
 class TranscriptClient:
     def fetch_transcript(self, url: str, *, language: str = "en") -> str:
         raise NotImplementedError
 
+    def fetch_segments(self, url: str, *, language: str = "en") -> List[TranscriptSegment]:
+        """Return timed segments; clients without timing yield one untimed segment."""
+
+        transcript = self.fetch_transcript(url, language=language)
+        return [TranscriptSegment(text=transcript, start=None, duration=None)]
+
 
 class YouTubeTranscriptClient(TranscriptClient):
     """Fetches transcripts for YouTube links using youtube-transcript-api."""
@@ -18,10 +160,22 @@ class YouTubeTranscriptClient(TranscriptClient):
         self.languages = languages or ["en"]
 
     def fetch_transcript(self, url: str, *, language: str = "en") -> str:
+        transcript, _ = SegmentIndex.build(self.fetch_segments(url, language=language))
+        return transcript
+
+    def fetch_segments(self, url: str, *, language: str = "en") -> List[TranscriptSegment]:
         video_id = self._extract_video_id(url)
         language_list = [language, *self.languages] if language not in self.languages else self.languages
         transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=language_list)
-        return "\n".join(chunk["text"] for chunk in transcript if chunk.get("text"))
+        return [
+            TranscriptSegment(
+                text=chunk["text"],
+                start=float(chunk.get("start") or 0.0),
+                duration=float(chunk.get("duration") or 0.0),
+            )
+            for chunk in transcript
+            if chunk.get("text")
+        ]
 
     @staticmethod
     def _extract_video_id(url: str) -> str: